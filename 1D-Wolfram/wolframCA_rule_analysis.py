@@ -0,0 +1,453 @@
+import os
+import json
+from collections import OrderedDict
+import numpy as np
+from wolframCA_functions import f_sys_initialize, f_WolframCA_rule_lookup
+
+
+# -----------------------------
+def f_rule_from_output_pattern(output_pattern):
+
+    """converts output pattern (as returned by 'f_WolframCA_rule_lookup') back to wolfram rule number
+
+    Arguments:
+        output_pattern (list of integers): output corresponding to each neighborhood configuration
+
+    Returns:
+        rule_number (int): wolfram rule number
+    """
+
+    rule_number = int("".join([str(int(x)) for x in output_pattern]), 2)
+
+    return (rule_number)
+
+
+# -----------------------------
+def f_rule_equivalents(rule_number, nb_size, n_states=2):
+
+    """generates rules equivalent to a given rule under left-right mirroring and 0/1 complement
+
+    Arguments:
+        rule_number (int): rule to use
+        nb_size (int): size of neighborhood to use
+        n_states (int): possible states of a cell (symmetries are defined for n_states=2 only)
+
+    Returns:
+        equivalents (dict): maps transformation name ("identity", "mirror", "complement", "mirror-complement") to rule number
+    """
+
+    input_pattern, output_pattern = f_WolframCA_rule_lookup(rule_number, nb_size, n_states)
+    config_index = {tuple(row): k for k, row in enumerate(input_pattern)} # neighborhood configuration -> row in lookup
+
+    # mirrored rule: output at neighborhood 'nb' is old output at reversed 'nb'
+    # complemented rule: output at neighborhood 'nb' is complement of old output at complemented 'nb'
+    output_mirror = [output_pattern[config_index[tuple(row[::-1])]] for row in input_pattern]
+    output_compl = [1 - output_pattern[config_index[tuple(1 - row)]] for row in input_pattern]
+    output_mirror_compl = [1 - output_pattern[config_index[tuple((1 - row)[::-1])]] for row in input_pattern]
+
+    equivalents = {"identity": rule_number,
+                   "mirror": f_rule_from_output_pattern(output_mirror),
+                   "complement": f_rule_from_output_pattern(output_compl),
+                   "mirror-complement": f_rule_from_output_pattern(output_mirror_compl)}
+
+    return (equivalents)
+
+
+# -----------------------------
+def f_rule_representative(rule_number, nb_size, n_states=2):
+
+    """finds representative (smallest rule number) of the equivalence class of a rule
+
+    Arguments:
+        rule_number (int): rule to use
+        nb_size (int): size of neighborhood to use
+        n_states (int): possible states of a cell
+
+    Returns:
+        rule_rep (int): representative rule of the class
+        transform (str): transformation giving 'rule_number' from 'rule_rep'
+            - all transformations are their own inverse, hence this is also the transformation giving 'rule_rep' from 'rule_number'
+            - if several transformations apply, the first in order "identity", "mirror", "complement", "mirror-complement" is used
+    """
+
+    equivalents = f_rule_equivalents(rule_number, nb_size, n_states)
+    rule_rep = min(equivalents.values())
+    transform = [t for t in equivalents if equivalents[t] == rule_rep][0] # dict keeps the order listed above
+
+    return (rule_rep, transform)
+
+
+# -----------------------------
+def f_rule_equivalence_classes(nb_size, n_states=2):
+
+    """groups all wolfram rules for a given neighborhood size into equivalence classes
+
+    Loops over all 2**(n_states**nb_size) rules; feasible only for small neighborhoods (e.g. nb_size=3).
+
+    Arguments:
+        nb_size (int): size of neighborhood to use
+        n_states (int): possible states of a cell
+
+    Returns:
+        rule_classes (dict): maps each rule number to (representative rule, transformation) as returned by 'f_rule_representative'
+    """
+
+    n_rules = 2 ** (n_states ** nb_size) # no. of possible rules
+    rule_classes = {rule_number: f_rule_representative(rule_number, nb_size, n_states) for rule_number in range(n_rules)}
+
+    return (rule_classes)
+
+
+# -----------------------------
+def f_rule_lookup_table(rule_number, nb_size, n_states):
+
+    """generates vectorized lookup for a given wolfram CA rule number
+
+    Arguments:
+        rule_number (int): rule to use
+        nb_size (int): size of neighborhood to use
+        n_states (int): possible states of a cell
+
+    Returns:
+        lookup_table (numpy array): new cell state for each neighborhood, indexed by the neighborhood read as a base 'n_states' number
+            - same outputs as matching neighborhoods against 'input_pattern' in 'f_evolve_WolframCA' (unmatched neighborhoods give 0)
+    """
+
+    input_pattern, output_pattern = f_WolframCA_rule_lookup(rule_number, nb_size, n_states)
+    nb_weights = n_states ** np.arange(nb_size - 1, -1, -1) # leftmost cell is most significant
+
+    lookup_table = np.zeros(shape=(n_states ** nb_size, ), dtype=int)
+    lookup_table[input_pattern.astype(int) @ nb_weights] = output_pattern
+
+    return (lookup_table)
+
+
+# -----------------------------
+def f_evolve_WolframCA_batch(sys_init_batch, nb_size, n_states, BC_type, rule_number, time_steps):
+
+    """evolves several systems together using wolfram CA rules (vectorized version of 'f_evolve_WolframCA')
+
+    Arguments:
+        sys_init_batch (numpy array): initial states; each row is one system
+        nb_size (int): size of neighborhood to use
+        n_states (int): possible states of a cell
+        BC_type (str): Boundary condition
+            - "periodic" or "p": implements periodic boundary condition
+            - "fix-L-R": fixed boundary condition where L and R are fixed cell states for left and right boundary (example: "fix-1-1")
+        rule_number (int): wolfram rule to use
+        time_steps (int): number of time steps
+
+    Returns:
+        sys_store_batch (numpy array): states with shape (time_steps+1, no. of systems, system size)
+    """
+
+    nb_order = int((nb_size - 1)/2) # order of neighborhood (nearest neighbour order)
+    n_sys, sys_size = sys_init_batch.shape
+    lookup_table = f_rule_lookup_table(rule_number, nb_size, n_states)
+
+    if ("fix" in BC_type) or ("Fix" in BC_type):
+        bc_L, bc_R = int(BC_type.split("-")[1]), int(BC_type.split("-")[2])
+        pad_L, pad_R = np.full((n_sys, nb_order), bc_L), np.full((n_sys, nb_order), bc_R)
+
+    sys_store_batch = np.zeros(shape=(time_steps + 1, n_sys, sys_size), dtype=int)
+    sys_store_batch[0] = sys_init_batch
+
+    for t in range(1, time_steps + 1):
+        sys_state_old = sys_store_batch[t-1]
+
+        if BC_type.lower() in ["periodic", "p"]:
+            sys_state_old_bc = np.concatenate((sys_state_old[:, sys_size-nb_order:],
+                                               sys_state_old,
+                                               sys_state_old[:, 0:nb_order]), axis=1)
+        else:
+            sys_state_old_bc = np.concatenate((pad_L, sys_state_old, pad_R), axis=1)
+
+        # index of local neighborhood of every cell in 'lookup_table'
+        nb_index = np.zeros(shape=(n_sys, sys_size), dtype=int)
+        for j in range(nb_size):
+            nb_index = nb_index * n_states + sys_state_old_bc[:, j:j+sys_size]
+
+        sys_store_batch[t] = lookup_table[nb_index]
+
+    return (sys_store_batch)
+
+
+# -----------------------------
+def f_detect_period(sys_store_list):
+
+    """detects period of the attractor reached by the system
+
+    Arguments:
+        sys_store_list (list of arrays): list that stores each time state of system
+
+    Returns:
+        period (int): period of the first repeated state (0 if no state repeats within the simulated time steps)
+    """
+
+    seen_states = {} # system state (as bytes) -> time step at which it was first seen
+    for t, sys_state in enumerate(sys_store_list):
+        key = np.asarray(sys_state, dtype=int).tobytes()
+        if key in seen_states:
+            return (t - seen_states[key])
+        seen_states[key] = t
+
+    return (0)
+
+
+# -----------------------------
+def f_rule_metrics(sys_size, init_rand_states, nb_size, n_states, BC_type, rule_number, time_steps):
+
+    """evolves randomly initialized systems with a rule and computes metrics characterizing the rule
+
+    All initial states, and their perturbed copies, are evolved together by 'f_evolve_WolframCA_batch'.
+
+    Arguments:
+        sys_size (int): size of system
+        init_rand_states (list of int): random states used for the initial states
+        nb_size (int): size of neighborhood to use
+        n_states (int): possible states of a cell
+        BC_type (str): Boundary condition ("periodic"/"p" or "fix-L-R")
+        rule_number (int): wolfram rule to use
+        time_steps (int): number of time steps
+
+    Returns:
+        metrics_list (list of dicts): computed metrics for each entry in 'init_rand_states'
+            - "density": mean cell state over second half of evolution
+            - "entropy": Shannon entropy (bits) of cell states over second half of evolution
+            - "damage": fraction of cells differing at final step after flipping centre cell of initial state
+            - "lyapunov": damage spreading rate ln(no. of damaged cells at final step)/time_steps (-inf if damage dies out)
+            - "period": period of attractor (0 if not detected within time_steps)
+    """
+
+    n_seeds = len(init_rand_states)
+    sys_init_batch = np.array([f_sys_initialize(sys_size, "r", init_rand_state, n_states) for init_rand_state in init_rand_states])
+    sys_init_perturbed = sys_init_batch.copy()
+    sys_init_perturbed[:, int(sys_size/2)] = (sys_init_perturbed[:, int(sys_size/2)] + 1) % n_states # flip centre cell
+
+    sys_store_batch = f_evolve_WolframCA_batch(np.concatenate((sys_init_batch, sys_init_perturbed)),
+                                               nb_size, n_states, BC_type, rule_number, time_steps)
+
+    metrics_list = []
+    for s in range(n_seeds):
+        sys_store = sys_store_batch[:, s, :]
+        sys_late = sys_store[int(time_steps/2):] # discard first half as transient
+
+        state_probs = np.bincount(sys_late.ravel(), minlength=n_states) / sys_late.size
+        state_probs = state_probs[state_probs > 0]
+        entropy = float(np.sum(state_probs * np.log2(1 / state_probs)))
+
+        n_damaged = int(np.sum(sys_store[-1] != sys_store_batch[-1, n_seeds + s, :]))
+        lyapunov = float(np.log(n_damaged) / time_steps) if (n_damaged > 0 and time_steps > 0) else float("-inf")
+
+        metrics_list.append({"density": float(np.mean(sys_late)),
+                             "entropy": entropy,
+                             "damage": n_damaged / sys_size,
+                             "lyapunov": lyapunov,
+                             "period": f_detect_period(list(sys_store))})
+
+    return (metrics_list)
+
+
+# -----------------------------
+def f_transform_metrics(metrics, transform):
+
+    """maps metrics of representative rule to an equivalent rule
+
+    The equivalent rule is not simulated: its metrics are those of the representative on the same random initial state,
+    which agree with its own metrics statistically over many initial states but not for each individual one.
+
+    Arguments:
+        metrics (dict): metrics of representative rule (see 'f_rule_metrics')
+        transform (str): transformation giving the equivalent rule from representative (see 'f_rule_representative')
+
+    Returns:
+        metrics_eq (dict): metrics of equivalent rule
+            - complement swaps states, hence density becomes (1 - density); all other metrics are taken as they are
+    """
+
+    metrics_eq = dict(metrics)
+    if "complement" in transform:
+        metrics_eq["density"] = 1 - metrics["density"]
+
+    return (metrics_eq)
+
+
+# -----------------------------
+def f_cache_load(cache_path):
+
+    """loads rule metrics cache from disk
+
+    Arguments:
+        cache_path (str): path of json cache file
+
+    Returns:
+        cache (OrderedDict): cache entries ordered from least to most recently used
+    """
+
+    if (cache_path is None) or (not os.path.exists(cache_path)):
+        return (OrderedDict())
+
+    with open(cache_path, "r") as f:
+        cache = json.load(f, object_pairs_hook=OrderedDict)
+
+    return (cache)
+
+
+# -----------------------------
+def f_cache_save(cache, cache_path):
+
+    """saves rule metrics cache to disk
+
+    Arguments:
+        cache (OrderedDict): cache entries ordered from least to most recently used
+        cache_path (str): path of json cache file
+
+    Returns:
+        None
+    """
+
+    if cache_path is None:
+        return None
+
+    cache_path_tmp = cache_path + ".tmp"
+    with open(cache_path_tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(cache_path_tmp, cache_path) # avoid corrupting cache if writing is interrupted
+
+    return None
+
+
+# -----------------------------
+def f_cache_key(rule_number, nb_size, n_states, BC_type, sys_size, init_rand_state, time_steps):
+
+    """creates key identifying a cached simulation
+
+    Arguments:
+        rule_number (int): simulated rule
+        nb_size (int): size of neighborhood
+        n_states (int): possible states of a cell
+        BC_type (str): Boundary condition
+        sys_size (int): size of system
+        init_rand_state (int): random state used for initial state
+        time_steps (int): number of time steps
+
+    Returns:
+        key (str): cache key
+    """
+
+    key = f"{rule_number}|{nb_size}|{n_states}|{BC_type.lower()}|{sys_size}|{init_rand_state}|{time_steps}"
+
+    return (key)
+
+
+# -----------------------------
+def f_cache_get(cache, key):
+
+    """returns cached metrics and marks entry as most recently used
+
+    Arguments:
+        cache (OrderedDict): cache entries ordered from least to most recently used
+        key (str): cache key (see 'f_cache_key')
+
+    Returns:
+        metrics (dict): cached metrics (None if key not in cache)
+    """
+
+    if key not in cache:
+        return None
+
+    cache.move_to_end(key)
+
+    return (cache[key])
+
+
+# -----------------------------
+def f_cache_put(cache, key, metrics, max_cache_entries):
+
+    """adds metrics to cache, evicting least recently used entries beyond 'max_cache_entries'
+
+    Arguments:
+        cache (OrderedDict): cache entries ordered from least to most recently used
+        key (str): cache key (see 'f_cache_key')
+        metrics (dict): metrics to cache
+        max_cache_entries (int): maximum no. of cache entries
+
+    Returns:
+        None
+    """
+
+    cache[key] = metrics
+    cache.move_to_end(key)
+    while len(cache) > max_cache_entries:
+        cache.popitem(last=False)
+
+    return None
+
+
+# -----------------------------
+def f_analyse_rule_space(sys_size, init_rand_states, nb_size, n_states, BC_type, time_steps,
+                         rule_numbers=None, cache_path=None, max_cache_entries=10000, cache=None, save_every=100):
+
+    """computes metrics for wolfram rules over several random initial states
+
+    For periodic boundary condition and n_states=2, rules equivalent under left-right mirroring and/or 0/1 complement
+    are simulated only once per class, using the representative of the class (see 'f_rule_representative'). Every rule
+    in the class reports the representative's metrics on each random initial state, with density complemented where
+    needed (see 'f_transform_metrics'). These are class-level values: per initial state they differ from simulating
+    the rule itself, and agree with it only statistically over many initial states. For fixed boundary conditions the
+    symmetries also change the boundary states, hence each rule is simulated directly.
+
+    Arguments:
+        sys_size (int): size of system
+        init_rand_states (list of int): random states used for initial states
+        nb_size (int): size of neighborhood to use
+        n_states (int): possible states of a cell
+        BC_type (str): Boundary condition ("periodic"/"p" or "fix-L-R")
+        time_steps (int): number of time steps
+        rule_numbers (list of int): rules to analyse (default=None; if None, all rules are analysed)
+        cache_path (str): path of json file to cache metrics on disk (default=None; no disk cache)
+        max_cache_entries (int): maximum no. of cached simulations; least recently used are evicted (default=10000)
+        cache (OrderedDict): already loaded cache to reuse across calls (default=None; loaded from 'cache_path')
+        save_every (int): cache is saved to disk after every 'save_every' new simulations (default=100)
+
+    Returns:
+        rule_metrics (dict): maps rule number to list of metrics dicts (one per entry in 'init_rand_states')
+    """
+
+    if rule_numbers is None:
+        rule_numbers = range(2 ** (n_states ** nb_size)) # all possible rules
+
+    collapse = (BC_type.lower() in ["periodic", "p"]) and (n_states == 2) # symmetries defined for 2 states only
+    if cache is None:
+        cache = f_cache_load(cache_path)
+    n_unsaved = 0 # no. of simulations not yet saved to disk
+
+    rule_metrics = {}
+    try:
+        for rule_number in rule_numbers:
+            rule_sim, transform = f_rule_representative(rule_number, nb_size, n_states) if collapse else (rule_number, "identity")
+
+            keys = [f_cache_key(rule_sim, nb_size, n_states, BC_type, sys_size, init_rand_state, time_steps)
+                    for init_rand_state in init_rand_states]
+            metrics_list = [f_cache_get(cache, key) for key in keys]
+
+            # simulate all initial states missing from cache together
+            missing = [i for i, metrics in enumerate(metrics_list) if metrics is None]
+            if missing:
+                metrics_new = f_rule_metrics(sys_size, [init_rand_states[i] for i in missing],
+                                             nb_size, n_states, BC_type, rule_sim, time_steps)
+                for i, metrics in zip(missing, metrics_new):
+                    metrics_list[i] = metrics
+                    f_cache_put(cache, keys[i], metrics, max_cache_entries)
+
+                n_unsaved += len(missing)
+                if n_unsaved >= save_every:
+                    f_cache_save(cache, cache_path)
+                    n_unsaved = 0
+
+            rule_metrics[rule_number] = [f_transform_metrics(metrics, transform) for metrics in metrics_list]
+
+    finally:
+        f_cache_save(cache, cache_path) # keeps simulations done so far if interrupted; also persists recency of cache hits
+
+    return (rule_metrics)
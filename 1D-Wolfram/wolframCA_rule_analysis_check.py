@@ -0,0 +1,88 @@
+import os
+import tempfile
+from collections import OrderedDict
+import numpy as np
+import wolframCA_rule_analysis
+from wolframCA_functions import f_evolve_WolframCA, f_sys_initialize
+from wolframCA_rule_analysis import f_rule_equivalence_classes, f_evolve_WolframCA_batch, f_rule_metrics, f_analyse_rule_space, f_cache_load, f_cache_get, f_cache_put
+
+# -----------------------------
+# Equivalence classes
+rule_classes = f_rule_equivalence_classes(nb_size=3, n_states=2)
+n_classes = len(set([rule_rep for (rule_rep, transform) in rule_classes.values()]))
+assert n_classes == 88, n_classes
+print(f"Equivalence classes for nb_size=3: {n_classes}")
+
+# -----------------------------
+# Batched evolution matches 'f_evolve_WolframCA'
+for (nb_size, BC_type, rule_number) in [(3, "p", 110), (3, "fix-1-0", 30), (5, "p", 12345)]:
+    sys_init = f_sys_initialize(31, "r", 0)
+    sys_store = np.array(f_evolve_WolframCA(31, "r", 0, nb_size, 2, BC_type, rule_number, 15))
+    sys_store_batch = f_evolve_WolframCA_batch(sys_init[None, :], nb_size, 2, BC_type, rule_number, 15)
+    assert np.array_equal(sys_store, sys_store_batch[:, 0, :]), (nb_size, BC_type, rule_number)
+print("Batched evolution matches f_evolve_WolframCA")
+
+# -----------------------------
+# Count batched evolutions
+n_evolve_calls = [0]
+f_evolve_WolframCA_batch_orig = wolframCA_rule_analysis.f_evolve_WolframCA_batch
+
+def f_evolve_WolframCA_batch_counted(*args, **kwargs):
+    n_evolve_calls[0] += 1
+    return (f_evolve_WolframCA_batch_orig(*args, **kwargs))
+
+wolframCA_rule_analysis.f_evolve_WolframCA_batch = f_evolve_WolframCA_batch_counted
+
+# -----------------------------
+# Equivalent rules share one simulation of all initial states (periodic BC)
+sys_size, init_rand_states, nb_size, n_states, BC_type, time_steps = 40, [0, 1], 3, 2, "p", 30
+rule_numbers = [110, 124, 137, 193]
+
+cache_path = os.path.join(tempfile.mkdtemp(), "rule_cache.json")
+rule_metrics = f_analyse_rule_space(sys_size, init_rand_states, nb_size, n_states, BC_type, time_steps,
+                                    rule_numbers=rule_numbers, cache_path=cache_path)
+assert n_evolve_calls[0] == 1, n_evolve_calls[0]
+assert len(f_cache_load(cache_path)) == len(init_rand_states)
+
+metrics_110 = f_rule_metrics(sys_size, init_rand_states, nb_size, n_states, BC_type, 110, time_steps)
+for rule_number in rule_numbers:
+    for i in range(len(init_rand_states)):
+        for name, value in metrics_110[i].items():
+            if (name == "density") and (rule_number in [137, 193]): # complemented rules
+                value = 1 - value
+            assert rule_metrics[rule_number][i][name] == value, (rule_number, i, name)
+print("Equivalent rules share one simulation")
+
+# -----------------------------
+# Second call is answered from the disk cache without evolving the system
+n_evolve_calls[0] = 0
+rule_metrics_cached = f_analyse_rule_space(sys_size, init_rand_states, nb_size, n_states, BC_type, time_steps,
+                                           rule_numbers=rule_numbers, cache_path=cache_path)
+assert n_evolve_calls[0] == 0, n_evolve_calls[0]
+assert rule_metrics_cached == rule_metrics
+print("Repeated query answered from cache")
+
+# -----------------------------
+# Fixed BC simulates each rule
+n_evolve_calls[0] = 0
+f_analyse_rule_space(sys_size, init_rand_states, nb_size, n_states, "fix-0-0", time_steps, rule_numbers=rule_numbers)
+assert n_evolve_calls[0] == len(rule_numbers), n_evolve_calls[0]
+
+wolframCA_rule_analysis.f_evolve_WolframCA_batch = f_evolve_WolframCA_batch_orig
+print("Fixed BC rules simulated directly")
+
+# -----------------------------
+# LRU eviction
+cache = OrderedDict()
+f_cache_put(cache, "a", {}, max_cache_entries=2)
+f_cache_put(cache, "b", {}, max_cache_entries=2)
+f_cache_get(cache, "a") # "a" becomes most recently used
+f_cache_put(cache, "c", {}, max_cache_entries=2)
+assert list(cache) == ["a", "c"], list(cache)
+
+rule_metrics = f_analyse_rule_space(sys_size, [0, 1, 2], nb_size, n_states, BC_type, time_steps,
+                                    rule_numbers=[30], cache_path=cache_path, max_cache_entries=2)
+cache = f_cache_load(cache_path)
+assert len(cache) == 2, len(cache)
+assert [key.split("|")[5] for key in cache] == ["1", "2"], list(cache)
+print("Least recently used cache entries evicted")